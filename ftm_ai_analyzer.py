@@ -5,30 +5,280 @@ Analyzes NS-3 simulation results and provides AI-driven recommendations
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Output is always written to file; no GUI backend needed
+matplotlib.rcParams.update({'axes.labelweight': 'bold'})
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import os
 import sys
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401  (enables the multi-threaded CSV reader)
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+NUMERIC_COLS = ['Distance(m)', 'Throughput(Mbps)', 'PDR(%)', 'Loss(%)',
+                'Delay(ms)', 'RSSI(dBm)']
+STAT_FUNCS = ['mean', 'min', 'max', 'std']
+# Reported metrics stay float64 so printed averages match the raw CSV values;
+# columns that are only binned or plotted are narrowed to float32
+DTYPES = {
+    'Time(s)': 'float32',
+    'Flow': 'category',
+    'Distance(m)': 'float64',
+    'Throughput(Mbps)': 'float64',
+    'PDR(%)': 'float64',
+    'Loss(%)': 'float64',
+    'Delay(ms)': 'float64',
+    'RSSI(dBm)': 'float64',
+    'TxPower(dBm)': 'float32',
+    'AI_Decision': 'category'
+}
+PHASE_BINS = [-np.inf, 5, 10, 15, np.inf]  # STA2 movement phases by Time(s)
+PHASE_LABELS = ['p1', 'p2', 'p3', 'p4']
+MAX_SCATTER_POINTS = 2000  # Cap on markers drawn in the correlation scatter
+NUMBA_MIN_ROWS = 1_000_000  # Below this, JIT compilation costs more than it saves
+
+# Streaming mode for CSVs too large to load at once
+STREAM_MIN_BYTES = 512 * 1024**2  # Stream files larger than this
+CHUNK_ROWS = 100_000              # Rows parsed per chunk when streaming
+SAMPLE_ROWS = 5000                # Reservoir size per flow when streaming
+STREAM_DTYPES = {col: ('float64' if dtype.startswith('float') else object)
+                 for col, dtype in DTYPES.items()}
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def compute_all_stats(values, flow_id, n_flows):
+        """Per-flow count/mean/M2/min/max of every column in one fused loop
+        
+        Columns are processed in parallel; rows are accumulated with
+        Welford's update so the variance stays stable for near-constant data.
+        """
+        n_rows, n_cols = values.shape
+        count = np.zeros((n_flows, n_cols))
+        mean = np.zeros((n_flows, n_cols))
+        m2 = np.zeros((n_flows, n_cols))
+        vmin = np.full((n_flows, n_cols), np.inf)
+        vmax = np.full((n_flows, n_cols), -np.inf)
+        for j in prange(n_cols):
+            for i in range(n_rows):
+                g = flow_id[i]
+                v = np.float64(values[i, j])
+                if g < 0 or np.isnan(v):
+                    continue
+                count[g, j] += 1
+                delta = v - mean[g, j]
+                mean[g, j] += delta / count[g, j]
+                m2[g, j] += delta * (v - mean[g, j])
+                if v < vmin[g, j]:
+                    vmin[g, j] = v
+                if v > vmax[g, j]:
+                    vmax[g, j] = v
+        return count, mean, m2, vmin, vmax
+
+def _stats_table(count, mean, m2, vmin, vmax):
+    """Build a STAT_FUNCS x NUMERIC_COLS table from one flow's moments"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(m2 / (count - 1))
+    has_data = count > 0
+    return pd.DataFrame([np.where(has_data, mean, np.nan),
+                         np.where(has_data, vmin, np.nan),
+                         np.where(has_data, vmax, np.nan),
+                         np.where(count > 1, std, np.nan)],
+                        index=STAT_FUNCS, columns=NUMERIC_COLS)
+
+def _safe_mean(total, count):
+    """Return total / count, or NaN where count is zero"""
+    return np.divide(total, count, out=np.full_like(total, np.nan, dtype=float),
+                     where=count > 0)
+
+def _merge_moments(a, b):
+    """Combine two (count, sum, M2, min, max) accumulators (Chan et al.)"""
+    na, ta, m2a, mina, maxa = a
+    nb, tb, m2b, minb, maxb = b
+    n = na + nb
+    w = np.divide(na * nb, n, out=np.zeros_like(n), where=n > 0)
+    delta = np.nan_to_num(_safe_mean(tb, nb) - _safe_mean(ta, na))
+    return (n, ta + tb, m2a + m2b + delta**2 * w,
+            np.fmin(mina, minb), np.fmax(maxa, maxb))
+
+def _flow_totals(df):
+    """Per-flow counts and sums behind the recommendations and phase means
+    
+    Every column is a plain count or sum, so totals from separate chunks
+    combine with add().
+    """
+    thr = df['Throughput(Mbps)']
+    far = df['Distance(m)'] > 15
+    phase = pd.cut(df['Time(s)'], bins=PHASE_BINS, labels=PHASE_LABELS)
+    cols = {
+        'rows': np.ones(len(df), dtype=np.int64),
+        'high_loss': df['Loss(%)'] > 10,
+        'far': far,
+        'far_thr_sum': thr.where(far),
+        'far_thr_n': far & thr.notna(),
+        'far_rssi_sum': df['RSSI(dBm)'].where(far),
+        'far_rssi_n': far & df['RSSI(dBm)'].notna(),
+    }
+    for label in PHASE_LABELS:
+        in_phase = phase == label
+        cols[f'{label}_thr_sum'] = thr.where(in_phase)
+        cols[f'{label}_thr_n'] = in_phase & thr.notna()
+    return (pd.DataFrame(cols, index=df.index)
+            .groupby(df['Flow'], sort=False, observed=True).sum())
+
 class FTMAnalyzer:
-    def __init__(self, csv_path="result/ftm_metrics.csv"):
-        """Initialize analyzer with CSV data"""
+    def __init__(self, csv_path="result/ftm_metrics.csv", chunksize=None):
+        """Initialize analyzer with CSV data
+        
+        CSVs larger than STREAM_MIN_BYTES, or any CSV when chunksize is
+        given, are streamed in chunks. Statistics, phase means,
+        recommendation inputs and decision counts are accumulated over every
+        row; only the plots use a reservoir sample of at most SAMPLE_ROWS
+        rows per flow.
+        """
         if not os.path.exists(csv_path):
             print(f"Error: {csv_path} not found!")
             print("Please run the NS-3 simulation first.")
             sys.exit(1)
         
-        self.df = pd.read_csv(csv_path)
+        if chunksize is None and os.path.getsize(csv_path) > STREAM_MIN_BYTES:
+            chunksize = CHUNK_ROWS
+        
         self.output_dir = "result"
+        self._fig = None
+        
+        if chunksize:
+            self.df, self.n_rows, flow_stats, flow_totals, decisions = \
+                self._read_streaming(csv_path, chunksize)
+        else:
+            self.df = pd.read_csv(csv_path, usecols=list(DTYPES), dtype=DTYPES,
+                                  engine=CSV_ENGINE)
+            self.n_rows = len(self.df)
+            flow_totals = _flow_totals(self.df)
+        
+        # Separate data by flow (single pass over the Flow column)
+        groups = dict(tuple(self.df.groupby('Flow', sort=False, observed=True)))
+        self.sta1_data = groups.get('AP1-STA1', self.df.iloc[:0])
+        self.sta2_data = groups.get('AP2-STA2', self.df.iloc[:0])
+        
+        # Per-flow summary statistics, shared by the console and report output
+        if chunksize:
+            empty = _stats_table(*(np.zeros(len(NUMERIC_COLS)),) * 5)
+            self.sta1_stats = flow_stats.get('AP1-STA1', empty)
+            self.sta2_stats = flow_stats.get('AP2-STA2', empty)
+            self.sta2_decision_counts = (
+                decisions.xs('AP2-STA2').sort_values(ascending=False, kind='stable')
+                if decisions is not None and 'AP2-STA2' in decisions.index
+                else pd.Series(dtype='int64'))
+        else:
+            self.sta1_stats, self.sta2_stats = self._compute_flow_stats()
+            # Count on plain labels so ties keep first-appearance order
+            # (categorical counts would order them alphabetically)
+            self.sta2_decision_counts = (
+                self.sta2_data['AI_Decision'].astype(object).value_counts())
+        
+        # Per-flow counts and sums for the phase and recommendation checks
+        totals = flow_totals.reindex(['AP1-STA1', 'AP2-STA2'], fill_value=0)
+        self.sta1_rows = int(totals.at['AP1-STA1', 'rows'])
+        self.sta2_rows = int(totals.at['AP2-STA2', 'rows'])
+        self.sta2_totals = totals.loc['AP2-STA2']
+        
+        print(f"Loaded {self.n_rows} data points from simulation")
+        if chunksize:
+            print(f"Streamed in chunks of {chunksize} rows; "
+                  f"sampled up to {SAMPLE_ROWS} rows per flow")
+        print(f"STA1 (Static): {self.sta1_rows} samples")
+        print(f"STA2 (Mobile): {self.sta2_rows} samples")
+    
+    def _read_streaming(self, csv_path, chunksize):
+        """Aggregate the CSV chunk by chunk in constant memory
+        
+        Returns (sample, n_rows, flow_stats, flow_totals, decision_counts)
+        where sample is a time-ordered reservoir sample of each flow for
+        plotting, flow_stats maps each flow to its summary table,
+        flow_totals is the _flow_totals() table summed over all chunks and
+        decision_counts is indexed by (Flow, AI_Decision) in order of first
+        appearance.
+        """
+        rng = np.random.default_rng(0)
+        reader = pd.read_csv(csv_path, usecols=list(DTYPES), dtype=STREAM_DTYPES,
+                             engine='c', low_memory=True, chunksize=chunksize)
+        n_rows = 0
+        moments = {}
+        flow_totals = _flow_totals(pd.DataFrame(columns=list(DTYPES))
+                                   .astype(STREAM_DTYPES))
+        decisions = None
+        reservoir = None
+        
+        for chunk in reader:
+            n_rows += len(chunk)
+            
+            # Running per-flow count, sum, M2, min and max
+            g = chunk.groupby('Flow', sort=False)[NUMERIC_COLS]
+            count, total, var = g.count(), g.sum(), g.var(ddof=0).fillna(0)
+            vmin, vmax = g.min(), g.max()
+            for flow in count.index:
+                n = count.loc[flow].to_numpy(dtype=float)
+                part = (n, total.loc[flow].to_numpy(), var.loc[flow].to_numpy() * n,
+                        vmin.loc[flow].to_numpy(), vmax.loc[flow].to_numpy())
+                moments[flow] = (_merge_moments(moments[flow], part)
+                                 if flow in moments else part)
+            
+            flow_totals = flow_totals.add(_flow_totals(chunk), fill_value=0)
+            
+            # Concatenate rather than add() so decisions keep first-appearance
+            # order, which the report uses to break ties
+            sizes = chunk.groupby(['Flow', 'AI_Decision'], sort=False).size()
+            decisions = (sizes if decisions is None else
+                         pd.concat([decisions, sizes])
+                         .groupby(level=[0, 1], sort=False).sum())
+            
+            # Reservoir sample: keep the SAMPLE_ROWS smallest random keys per flow
+            chunk = chunk.assign(_key=rng.random(len(chunk)))
+            pool = chunk if reservoir is None else pd.concat([reservoir, chunk])
+            reservoir = (pool.sort_values('_key')
+                         .groupby('Flow', sort=False).head(SAMPLE_ROWS))
+        
+        if reservoir is None:
+            sample = pd.DataFrame(columns=list(DTYPES)).astype(DTYPES)
+        else:
+            sample = reservoir.drop(columns='_key').sort_index().astype(DTYPES)
+        if decisions is not None:
+            decisions = decisions.astype('int64')
+        flow_stats = {flow: _stats_table(n, _safe_mean(total, n), m2, vmin, vmax)
+                      for flow, (n, total, m2, vmin, vmax) in moments.items()}
+        return sample, n_rows, flow_stats, flow_totals, decisions
+    
+    def _compute_flow_stats(self):
+        """Return (sta1, sta2) tables of STAT_FUNCS x NUMERIC_COLS"""
+        if not HAVE_NUMBA or len(self.df) < NUMBA_MIN_ROWS:
+            return (self.sta1_data[NUMERIC_COLS].agg(STAT_FUNCS),
+                    self.sta2_data[NUMERIC_COLS].agg(STAT_FUNCS))
         
-        # Separate data by flow
-        self.sta1_data = self.df[self.df['Flow'] == 'AP1-STA1'].copy()
-        self.sta2_data = self.df[self.df['Flow'] == 'AP2-STA2'].copy()
+        flows = self.df['Flow'].astype('category')
+        count, mean, m2, vmin, vmax = compute_all_stats(
+            self.df[NUMERIC_COLS].to_numpy(),
+            flows.cat.codes.to_numpy().astype(np.int32),
+            len(flows.cat.categories))
         
-        print(f"Loaded {len(self.df)} data points from simulation")
-        print(f"STA1 (Static): {len(self.sta1_data)} samples")
-        print(f"STA2 (Mobile): {len(self.sta2_data)} samples")
+        def table(flow):
+            if flow not in flows.cat.categories:
+                return _stats_table(*(np.zeros(len(NUMERIC_COLS)),) * 5)
+            g = flows.cat.categories.get_loc(flow)
+            return _stats_table(count[g], mean[g], m2[g], vmin[g], vmax[g])
+        
+        return table('AP1-STA1'), table('AP2-STA2')
     
     def analyze_performance(self):
         """Analyze performance metrics"""
@@ -36,50 +286,49 @@ class FTMAnalyzer:
         print("FTM ADAPTIVE WIFI - AI PERFORMANCE ANALYSIS")
         print("="*70)
         
+        s1, s2 = self.sta1_stats, self.sta2_stats
+        
         # STA1 Analysis (Static)
         print("\n[STA1 - STATIC STATION (5m from AP1)]")
         print("-" * 70)
         if len(self.sta1_data) > 0:
-            print(f"Average Distance:    {self.sta1_data['Distance(m)'].mean():.2f} m")
-            print(f"Average Throughput:  {self.sta1_data['Throughput(Mbps)'].mean():.3f} Mbps")
-            print(f"Average PDR:         {self.sta1_data['PDR(%)'].mean():.2f}%")
-            print(f"Average Loss:        {self.sta1_data['Loss(%)'].mean():.2f}%")
-            print(f"Average Delay:       {self.sta1_data['Delay(ms)'].mean():.3f} ms")
-            print(f"Average RSSI:        {self.sta1_data['RSSI(dBm)'].mean():.2f} dBm")
-            print(f"Throughput Range:    {self.sta1_data['Throughput(Mbps)'].min():.3f} - "
-                  f"{self.sta1_data['Throughput(Mbps)'].max():.3f} Mbps")
+            print(f"Average Distance:    {s1.loc['mean', 'Distance(m)']:.2f} m")
+            print(f"Average Throughput:  {s1.loc['mean', 'Throughput(Mbps)']:.3f} Mbps")
+            print(f"Average PDR:         {s1.loc['mean', 'PDR(%)']:.2f}%")
+            print(f"Average Loss:        {s1.loc['mean', 'Loss(%)']:.2f}%")
+            print(f"Average Delay:       {s1.loc['mean', 'Delay(ms)']:.3f} ms")
+            print(f"Average RSSI:        {s1.loc['mean', 'RSSI(dBm)']:.2f} dBm")
+            print(f"Throughput Range:    {s1.loc['min', 'Throughput(Mbps)']:.3f} - "
+                  f"{s1.loc['max', 'Throughput(Mbps)']:.3f} Mbps")
         
         # STA2 Analysis (Mobile)
         print("\n[STA2 - MOBILE STATION (5m -> 20m -> 10m from AP2)]")
         print("-" * 70)
         if len(self.sta2_data) > 0:
-            print(f"Distance Range:      {self.sta2_data['Distance(m)'].min():.2f} - "
-                  f"{self.sta2_data['Distance(m)'].max():.2f} m")
-            print(f"Average Throughput:  {self.sta2_data['Throughput(Mbps)'].mean():.3f} Mbps")
-            print(f"Average PDR:         {self.sta2_data['PDR(%)'].mean():.2f}%")
-            print(f"Average Loss:        {self.sta2_data['Loss(%)'].mean():.2f}%")
-            print(f"Average Delay:       {self.sta2_data['Delay(ms)'].mean():.3f} ms")
-            print(f"Average RSSI:        {self.sta2_data['RSSI(dBm)'].mean():.2f} dBm")
-            print(f"Throughput Range:    {self.sta2_data['Throughput(Mbps)'].min():.3f} - "
-                  f"{self.sta2_data['Throughput(Mbps)'].max():.3f} Mbps")
+            print(f"Distance Range:      {s2.loc['min', 'Distance(m)']:.2f} - "
+                  f"{s2.loc['max', 'Distance(m)']:.2f} m")
+            print(f"Average Throughput:  {s2.loc['mean', 'Throughput(Mbps)']:.3f} Mbps")
+            print(f"Average PDR:         {s2.loc['mean', 'PDR(%)']:.2f}%")
+            print(f"Average Loss:        {s2.loc['mean', 'Loss(%)']:.2f}%")
+            print(f"Average Delay:       {s2.loc['mean', 'Delay(ms)']:.3f} ms")
+            print(f"Average RSSI:        {s2.loc['mean', 'RSSI(dBm)']:.2f} dBm")
+            print(f"Throughput Range:    {s2.loc['min', 'Throughput(Mbps)']:.3f} - "
+                  f"{s2.loc['max', 'Throughput(Mbps)']:.3f} Mbps")
             
             # Movement phases
-            phase1 = self.sta2_data[self.sta2_data['Time(s)'] <= 5]
-            phase2 = self.sta2_data[(self.sta2_data['Time(s)'] > 5) & 
-                                   (self.sta2_data['Time(s)'] <= 10)]
-            phase3 = self.sta2_data[(self.sta2_data['Time(s)'] > 10) & 
-                                   (self.sta2_data['Time(s)'] <= 15)]
-            phase4 = self.sta2_data[self.sta2_data['Time(s)'] > 15]
-            
+            t = self.sta2_totals
+            means = {label: _safe_mean(t[f'{label}_thr_sum'], t[f'{label}_thr_n'])
+                     for label in PHASE_LABELS}
+
             print("\nMovement Phase Analysis:")
             print(f"  Phase 1 (0-5s, ~5m):    Avg Throughput = "
-                  f"{phase1['Throughput(Mbps)'].mean():.3f} Mbps")
+                  f"{means['p1']:.3f} Mbps")
             print(f"  Phase 2 (5-10s, moving): Avg Throughput = "
-                  f"{phase2['Throughput(Mbps)'].mean():.3f} Mbps")
+                  f"{means['p2']:.3f} Mbps")
             print(f"  Phase 3 (10-15s, ~20m):  Avg Throughput = "
-                  f"{phase3['Throughput(Mbps)'].mean():.3f} Mbps")
+                  f"{means['p3']:.3f} Mbps")
             print(f"  Phase 4 (15-20s, moving): Avg Throughput = "
-                  f"{phase4['Throughput(Mbps)'].mean():.3f} Mbps")
+                  f"{means['p4']:.3f} Mbps")
     
     def ai_recommendations(self):
         """Generate AI-driven recommendations"""
@@ -87,14 +336,19 @@ class FTMAnalyzer:
         print("AI RECOMMENDATIONS")
         print("="*70)
         
+        if self.sta1_data.empty and self.sta2_data.empty:
+            print("\n✓ No critical issues detected. System performing optimally.")
+            return []
+        
         recommendations = []
         
         # Analyze STA2 performance degradation
-        if len(self.sta2_data) > 0:
-            far_distance = self.sta2_data[self.sta2_data['Distance(m)'] > 15]
-            if len(far_distance) > 0:
-                avg_throughput_far = far_distance['Throughput(Mbps)'].mean()
-                avg_rssi_far = far_distance['RSSI(dBm)'].mean()
+        if not self.sta2_data.empty:
+            t = self.sta2_totals
+            if t['far'] > 0:
+                # Missing cells are excluded; all-missing gives NaN
+                avg_throughput_far = _safe_mean(t['far_thr_sum'], t['far_thr_n'])
+                avg_rssi_far = _safe_mean(t['far_rssi_sum'], t['far_rssi_n'])
                 
                 if avg_throughput_far < 3.0:  # Less than 60% of target
                     recommendations.append({
@@ -113,18 +367,18 @@ class FTMAnalyzer:
                     })
             
             # Check packet loss
-            high_loss = self.sta2_data[self.sta2_data['Loss(%)'] > 10]
-            if len(high_loss) > 0:
+            n_high_loss = int(t['high_loss'])
+            if n_high_loss > 0:
                 recommendations.append({
                     'priority': 'MEDIUM',
                     'issue': 'High packet loss detected',
-                    'metric': f'{len(high_loss)} intervals with >10% loss',
+                    'metric': f'{n_high_loss} intervals with >10% loss',
                     'action': 'Implement rate adaptation or increase retransmission limit'
                 })
         
         # Analyze STA1 stability
-        if len(self.sta1_data) > 0:
-            throughput_std = self.sta1_data['Throughput(Mbps)'].std()
+        if not self.sta1_data.empty:
+            throughput_std = self.sta1_stats.loc['std', 'Throughput(Mbps)']
             if throughput_std > 0.5:
                 recommendations.append({
                     'priority': 'LOW',
@@ -144,26 +398,51 @@ class FTMAnalyzer:
         
         return recommendations
     
+    def _get_figure(self, figsize):
+        """Return the shared Agg figure, cleared and resized to figsize"""
+        if self._fig is None:
+            self._fig = Figure(figsize=figsize, layout='constrained')
+            FigureCanvasAgg(self._fig)
+        else:
+            self._fig.clear()
+            self._fig.set_size_inches(figsize)
+        return self._fig
+    
     def visualize_results(self):
         """Create comprehensive visualization"""
         print("\n" + "="*70)
         print("GENERATING VISUALIZATIONS")
         print("="*70)
         
-        fig, axes = plt.subplots(3, 2, figsize=(16, 12))
+        # Extract plain ndarrays once so Matplotlib skips Series conversion
+        t1 = self.sta1_data['Time(s)'].to_numpy()
+        dist1 = self.sta1_data['Distance(m)'].to_numpy()
+        thr1 = self.sta1_data['Throughput(Mbps)'].to_numpy()
+        rssi1 = self.sta1_data['RSSI(dBm)'].to_numpy()
+        pdr1 = self.sta1_data['PDR(%)'].to_numpy()
+        tx1 = self.sta1_data['TxPower(dBm)'].to_numpy()
+        t2 = self.sta2_data['Time(s)'].to_numpy()
+        dist2 = self.sta2_data['Distance(m)'].to_numpy()
+        thr2 = self.sta2_data['Throughput(Mbps)'].to_numpy()
+        rssi2 = self.sta2_data['RSSI(dBm)'].to_numpy()
+        pdr2 = self.sta2_data['PDR(%)'].to_numpy()
+        tx2 = self.sta2_data['TxPower(dBm)'].to_numpy()
+        
+        fig = self._get_figure((16, 12))
+        axes = fig.subplots(3, 2)
         fig.suptitle('FTM Adaptive WiFi Performance Analysis', 
                      fontsize=16, fontweight='bold')
         
         # Plot 1: Distance vs Time
         ax1 = axes[0, 0]
         if len(self.sta1_data) > 0:
-            ax1.plot(self.sta1_data['Time(s)'], self.sta1_data['Distance(m)'], 
+            ax1.plot(t1, dist1, 
                     'b-o', label='STA1 (Static)', linewidth=2, markersize=4)
         if len(self.sta2_data) > 0:
-            ax1.plot(self.sta2_data['Time(s)'], self.sta2_data['Distance(m)'], 
+            ax1.plot(t2, dist2, 
                     'r-s', label='STA2 (Mobile)', linewidth=2, markersize=4)
-        ax1.set_xlabel('Time (s)', fontweight='bold')
-        ax1.set_ylabel('Distance (m)', fontweight='bold')
+        ax1.set_xlabel('Time (s)')
+        ax1.set_ylabel('Distance (m)')
         ax1.set_title('Distance from AP over Time')
         ax1.legend()
         ax1.grid(True, alpha=0.3)
@@ -171,14 +450,14 @@ class FTMAnalyzer:
         # Plot 2: Throughput vs Time
         ax2 = axes[0, 1]
         if len(self.sta1_data) > 0:
-            ax2.plot(self.sta1_data['Time(s)'], self.sta1_data['Throughput(Mbps)'], 
+            ax2.plot(t1, thr1, 
                     'b-o', label='STA1 (Static)', linewidth=2, markersize=4)
         if len(self.sta2_data) > 0:
-            ax2.plot(self.sta2_data['Time(s)'], self.sta2_data['Throughput(Mbps)'], 
+            ax2.plot(t2, thr2, 
                     'r-s', label='STA2 (Mobile)', linewidth=2, markersize=4)
         ax2.axhline(y=5.0, color='g', linestyle='--', label='Target (5 Mbps)', alpha=0.7)
-        ax2.set_xlabel('Time (s)', fontweight='bold')
-        ax2.set_ylabel('Throughput (Mbps)', fontweight='bold')
+        ax2.set_xlabel('Time (s)')
+        ax2.set_ylabel('Throughput (Mbps)')
         ax2.set_title('Throughput over Time')
         ax2.legend()
         ax2.grid(True, alpha=0.3)
@@ -186,29 +465,31 @@ class FTMAnalyzer:
         # Plot 3: Distance vs Throughput (Correlation)
         ax3 = axes[1, 0]
         if len(self.sta2_data) > 0:
-            ax3.scatter(self.sta2_data['Distance(m)'], 
-                       self.sta2_data['Throughput(Mbps)'], 
-                       c=self.sta2_data['Time(s)'], cmap='viridis', 
+            idx = slice(None)
+            if len(dist2) > MAX_SCATTER_POINTS:
+                idx = np.linspace(0, len(dist2) - 1,
+                                  MAX_SCATTER_POINTS).astype(np.intp)
+            ax3.scatter(dist2[idx], thr2[idx], c=t2[idx], cmap='viridis', 
                        s=100, alpha=0.6, edgecolors='black')
-            cbar = plt.colorbar(ax3.collections[0], ax=ax3)
-            cbar.set_label('Time (s)', fontweight='bold')
-        ax3.set_xlabel('Distance (m)', fontweight='bold')
-        ax3.set_ylabel('Throughput (Mbps)', fontweight='bold')
+            cbar = fig.colorbar(ax3.collections[0], ax=ax3)
+            cbar.set_label('Time (s)')
+        ax3.set_xlabel('Distance (m)')
+        ax3.set_ylabel('Throughput (Mbps)')
         ax3.set_title('Distance vs Throughput (STA2)')
         ax3.grid(True, alpha=0.3)
         
         # Plot 4: RSSI vs Time
         ax4 = axes[1, 1]
         if len(self.sta1_data) > 0:
-            ax4.plot(self.sta1_data['Time(s)'], self.sta1_data['RSSI(dBm)'], 
+            ax4.plot(t1, rssi1, 
                     'b-o', label='STA1 (Static)', linewidth=2, markersize=4)
         if len(self.sta2_data) > 0:
-            ax4.plot(self.sta2_data['Time(s)'], self.sta2_data['RSSI(dBm)'], 
+            ax4.plot(t2, rssi2, 
                     'r-s', label='STA2 (Mobile)', linewidth=2, markersize=4)
         ax4.axhline(y=-70, color='orange', linestyle='--', 
                    label='Weak Signal (-70 dBm)', alpha=0.7)
-        ax4.set_xlabel('Time (s)', fontweight='bold')
-        ax4.set_ylabel('RSSI (dBm)', fontweight='bold')
+        ax4.set_xlabel('Time (s)')
+        ax4.set_ylabel('RSSI (dBm)')
         ax4.set_title('Received Signal Strength over Time')
         ax4.legend()
         ax4.grid(True, alpha=0.3)
@@ -216,15 +497,15 @@ class FTMAnalyzer:
         # Plot 5: PDR and Loss
         ax5 = axes[2, 0]
         if len(self.sta1_data) > 0:
-            ax5.plot(self.sta1_data['Time(s)'], self.sta1_data['PDR(%)'], 
+            ax5.plot(t1, pdr1, 
                     'b-o', label='STA1 PDR', linewidth=2, markersize=4)
         if len(self.sta2_data) > 0:
-            ax5.plot(self.sta2_data['Time(s)'], self.sta2_data['PDR(%)'], 
+            ax5.plot(t2, pdr2, 
                     'r-s', label='STA2 PDR', linewidth=2, markersize=4)
         ax5.axhline(y=90, color='g', linestyle='--', 
                    label='Target (90%)', alpha=0.7)
-        ax5.set_xlabel('Time (s)', fontweight='bold')
-        ax5.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold')
+        ax5.set_xlabel('Time (s)')
+        ax5.set_ylabel('Packet Delivery Ratio (%)')
         ax5.set_title('PDR over Time')
         ax5.legend()
         ax5.grid(True, alpha=0.3)
@@ -232,37 +513,38 @@ class FTMAnalyzer:
         # Plot 6: TX Power Adjustment
         ax6 = axes[2, 1]
         if len(self.sta1_data) > 0:
-            ax6.plot(self.sta1_data['Time(s)'], self.sta1_data['TxPower(dBm)'], 
+            ax6.plot(t1, tx1, 
                     'b-o', label='AP1 TX Power', linewidth=2, markersize=4)
         if len(self.sta2_data) > 0:
-            ax6.plot(self.sta2_data['Time(s)'], self.sta2_data['TxPower(dBm)'], 
+            ax6.plot(t2, tx2, 
                     'r-s', label='AP2 TX Power', linewidth=2, markersize=4)
-        ax6.set_xlabel('Time (s)', fontweight='bold')
-        ax6.set_ylabel('TX Power (dBm)', fontweight='bold')
+        ax6.set_xlabel('Time (s)')
+        ax6.set_ylabel('TX Power (dBm)')
         ax6.set_title('AI-Adaptive TX Power Adjustment')
         ax6.legend()
         ax6.grid(True, alpha=0.3)
         
-        plt.tight_layout()
         output_path = os.path.join(self.output_dir, 'ftm_analysis.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        fig.savefig(output_path, dpi=150, bbox_inches='tight',
+                    pil_kwargs={'compress_level': 1})
         print(f"✓ Saved visualization: {output_path}")
-        plt.close()
         
         # Create AI decision timeline
         self.plot_ai_decisions()
     
     def plot_ai_decisions(self):
         """Plot AI decision timeline"""
-        fig, ax = plt.subplots(figsize=(14, 6))
+        fig = self._get_figure((14, 6))
+        ax = fig.subplots()
         
-        # Count AI decisions
         if len(self.sta2_data) > 0:
-            decision_counts = self.sta2_data['AI_Decision'].value_counts()
-            
             # Timeline of decisions
-            decisions = self.sta2_data['AI_Decision'].tolist()
-            times = self.sta2_data['Time(s)'].tolist()
+            cats = self.sta2_data['AI_Decision'].astype('category')
+            codes = cats.cat.codes.to_numpy()
+            
+            # Decisions present, resolved in the integer code domain
+            decisions = set(cats.cat.categories[np.unique(codes[codes >= 0])])
+            times = self.sta2_data['Time(s)'].to_numpy()
             
             # Color map for decisions
             color_map = {
@@ -272,16 +554,20 @@ class FTMAnalyzer:
                 'decrease_power': 'blue'
             }
             
-            colors = [color_map.get(d, 'gray') for d in decisions]
+            # One color per category; the trailing entry catches missing
+            # values, whose code is -1
+            palette = np.array([color_map.get(c, 'gray')
+                                for c in cats.cat.categories] + ['gray'])
+            colors = palette[codes]
             
-            ax.scatter(times, [1]*len(times), c=colors, s=200, 
+            ax.scatter(times, np.ones(len(times)), c=colors, s=200, 
                       alpha=0.7, edgecolors='black', linewidths=1.5)
             
             # Add distance as background
             ax2 = ax.twinx()
-            ax2.plot(self.sta2_data['Time(s)'], self.sta2_data['Distance(m)'], 
+            ax2.plot(times, self.sta2_data['Distance(m)'].to_numpy(), 
                     'k--', alpha=0.3, linewidth=2, label='Distance')
-            ax2.set_ylabel('Distance (m)', fontweight='bold')
+            ax2.set_ylabel('Distance (m)')
             
             # Legend
             from matplotlib.patches import Patch
@@ -290,60 +576,62 @@ class FTMAnalyzer:
                              if decision in decisions]
             ax.legend(handles=legend_elements, loc='upper left')
             
-            ax.set_xlabel('Time (s)', fontweight='bold')
-            ax.set_ylabel('AI Decision Event', fontweight='bold')
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('AI Decision Event')
             ax.set_title('AI Decision Timeline for STA2 Adaptive Control', 
                         fontweight='bold')
             ax.set_ylim(0.5, 1.5)
             ax.set_yticks([])
             ax.grid(True, alpha=0.3, axis='x')
             
-            plt.tight_layout()
             output_path = os.path.join(self.output_dir, 'ai_decision_timeline.png')
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+            fig.savefig(output_path, dpi=150, bbox_inches='tight',
+                        pil_kwargs={'compress_level': 1})
             print(f"✓ Saved AI decision timeline: {output_path}")
-            plt.close()
     
     def export_summary_report(self):
         """Export comprehensive summary report"""
         report_path = os.path.join(self.output_dir, 'ftm_summary_report.txt')
+        s1, s2 = self.sta1_stats, self.sta2_stats
         
-        with open(report_path, 'w') as f:
-            f.write("="*70 + "\n")
-            f.write("FTM ADAPTIVE WIFI - COMPREHENSIVE ANALYSIS REPORT\n")
-            f.write("="*70 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Samples: {len(self.df)}\n\n")
-            
-            # STA1 Summary
-            f.write("[STA1 - STATIC STATION]\n")
-            f.write("-"*70 + "\n")
-            if len(self.sta1_data) > 0:
-                f.write(f"Average Distance:    {self.sta1_data['Distance(m)'].mean():.2f} m\n")
-                f.write(f"Average Throughput:  {self.sta1_data['Throughput(Mbps)'].mean():.3f} Mbps\n")
-                f.write(f"Average PDR:         {self.sta1_data['PDR(%)'].mean():.2f}%\n")
-                f.write(f"Average Loss:        {self.sta1_data['Loss(%)'].mean():.2f}%\n")
-                f.write(f"Average Delay:       {self.sta1_data['Delay(ms)'].mean():.3f} ms\n")
-                f.write(f"Average RSSI:        {self.sta1_data['RSSI(dBm)'].mean():.2f} dBm\n\n")
+        parts = []
+        parts.append("="*70 + "\n")
+        parts.append("FTM ADAPTIVE WIFI - COMPREHENSIVE ANALYSIS REPORT\n")
+        parts.append("="*70 + "\n")
+        parts.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        parts.append(f"Total Samples: {self.n_rows}\n\n")
+        
+        # STA1 Summary
+        parts.append("[STA1 - STATIC STATION]\n")
+        parts.append("-"*70 + "\n")
+        if len(self.sta1_data) > 0:
+            parts.append(f"Average Distance:    {s1.loc['mean', 'Distance(m)']:.2f} m\n")
+            parts.append(f"Average Throughput:  {s1.loc['mean', 'Throughput(Mbps)']:.3f} Mbps\n")
+            parts.append(f"Average PDR:         {s1.loc['mean', 'PDR(%)']:.2f}%\n")
+            parts.append(f"Average Loss:        {s1.loc['mean', 'Loss(%)']:.2f}%\n")
+            parts.append(f"Average Delay:       {s1.loc['mean', 'Delay(ms)']:.3f} ms\n")
+            parts.append(f"Average RSSI:        {s1.loc['mean', 'RSSI(dBm)']:.2f} dBm\n\n")
+        
+        # STA2 Summary
+        parts.append("[STA2 - MOBILE STATION]\n")
+        parts.append("-"*70 + "\n")
+        if len(self.sta2_data) > 0:
+            parts.append(f"Distance Range:      {s2.loc['min', 'Distance(m)']:.2f} - "
+                         f"{s2.loc['max', 'Distance(m)']:.2f} m\n")
+            parts.append(f"Average Throughput:  {s2.loc['mean', 'Throughput(Mbps)']:.3f} Mbps\n")
+            parts.append(f"Average PDR:         {s2.loc['mean', 'PDR(%)']:.2f}%\n")
+            parts.append(f"Average Loss:        {s2.loc['mean', 'Loss(%)']:.2f}%\n")
+            parts.append(f"Average Delay:       {s2.loc['mean', 'Delay(ms)']:.3f} ms\n")
+            parts.append(f"Average RSSI:        {s2.loc['mean', 'RSSI(dBm)']:.2f} dBm\n\n")
             
-            # STA2 Summary
-            f.write("[STA2 - MOBILE STATION]\n")
-            f.write("-"*70 + "\n")
-            if len(self.sta2_data) > 0:
-                f.write(f"Distance Range:      {self.sta2_data['Distance(m)'].min():.2f} - "
-                       f"{self.sta2_data['Distance(m)'].max():.2f} m\n")
-                f.write(f"Average Throughput:  {self.sta2_data['Throughput(Mbps)'].mean():.3f} Mbps\n")
-                f.write(f"Average PDR:         {self.sta2_data['PDR(%)'].mean():.2f}%\n")
-                f.write(f"Average Loss:        {self.sta2_data['Loss(%)'].mean():.2f}%\n")
-                f.write(f"Average Delay:       {self.sta2_data['Delay(ms)'].mean():.3f} ms\n")
-                f.write(f"Average RSSI:        {self.sta2_data['RSSI(dBm)'].mean():.2f} dBm\n\n")
-                
-                # AI Decision Summary
-                f.write("[AI DECISION SUMMARY]\n")
-                f.write("-"*70 + "\n")
-                decision_counts = self.sta2_data['AI_Decision'].value_counts()
-                for decision, count in decision_counts.items():
-                    f.write(f"{decision}: {count} times\n")
+            # AI Decision Summary
+            parts.append("[AI DECISION SUMMARY]\n")
+            parts.append("-"*70 + "\n")
+            for decision, count in self.sta2_decision_counts.items():
+                parts.append(f"{decision}: {count} times\n")
+        
+        with open(report_path, 'w') as f:
+            f.write(''.join(parts))
         
         print(f"✓ Saved summary report: {report_path}")
     